@@ -1,3 +1,4 @@
+import bisect
 import functools
 
 from collections import namedtuple
@@ -20,57 +21,194 @@ class InvalidPaymentError(Error):
     def __init__(self, *args, **kwargs):
         super(InvalidPaymentError, self).__init__(*args, **kwargs)
 
+class InvalidInterestChangeDateError(Error):
+    def __init__(self, date):
+        super(InvalidInterestChangeDateError, self).__init__(
+            "Invalid interest change date: {}.", format_date(date))
+
 Credit = namedtuple("Credit", ("start_date", "end_date", "amount", "current_amount", "interest", "month_pay", "schedule"))
 Payment = namedtuple("Payment", ("date", "credit_pay", "interest_pay", "month_pay", "credit"))
 MonthInterest = namedtuple("MonthInterest", ("date", "interest"))
 
 
 
-def get_credit_info(info_date, start_date, end_date, amount, interest, payments={}):
+def get_credit_info(info_date, start_date, end_date, amount, interest, payments={}, interest_changes={}):
     info_date = get_date(info_date)
     start_date = get_date(start_date)
     end_date = get_date(end_date)
     amount = Decimal(amount)
     interest = Decimal(interest)
+    interest_changes = _get_interest_changes(interest_changes)
+
+    plan = get_credit_plan(start_date, end_date)
+    payment_schedule = plan.calculate(amount, interest, payments, interest_changes)
 
-    payment_schedule = _calculate(start_date, end_date, amount, interest, payments)
+    current_interest = interest_changes.get(start_date, interest)
+    for date in sorted(interest_changes):
+        if date < info_date:
+            current_interest = interest_changes[date]
 
     month_pay = None
 
     if info_date <= end_date:
-        prev_date = start_date
-        current_amount = amount
+        info_ordinal = info_date.toordinal()
+        paid_months = bisect.bisect_right(plan.ordinals, info_ordinal)
 
-        for payment in payment_schedule:
-            if not (payment.date <= info_date or prev_date < info_date):
-                break
-
-            if payment.date <= info_date:
-                current_amount = payment.credit
+        if paid_months:
+            current_amount = payment_schedule[paid_months - 1].credit
+        else:
+            current_amount = amount
 
-            month_pay = payment.month_pay
-            prev_date = payment.date
+        if paid_months and plan.ordinals[paid_months - 1] == info_ordinal:
+            month_pay = payment_schedule[paid_months - 1].month_pay
+        elif info_date > start_date:
+            month_pay = payment_schedule[paid_months].month_pay
     else:
         current_amount = 0
 
-    return Credit(start_date, end_date, amount, current_amount, interest, month_pay, payment_schedule)
+    return Credit(start_date, end_date, amount, current_amount, current_interest, month_pay, payment_schedule)
 
 
-def _nearest_valid_date(year, month, day):
-    date_string = "{:02d}.{:02d}.{:04d}".format(day, month, year)
+@functools.lru_cache(maxsize=1024)
+def get_credit_plan(start_date, end_date):
+    return CreditPlan(start_date, end_date)
+
+
+class CreditPlan:
+    # The plan depends only on the credit dates, so it's reused to calculate
+    # payment schedules for any amounts, interests and payments. A month's
+    # interest is charged for first_days of a year with first_year_days days
+    # plus second_days of the next year if the month crosses a year boundary.
+
+    __slots__ = ("start_date", "end_date", "dates", "ordinals",
+        "first_days", "first_year_days", "second_days", "second_year_days", "remaining_months")
+
+    def __init__(self, start_date, end_date):
+        self.start_date = get_date(start_date)
+        self.end_date = get_date(end_date)
+
+        dates = []
+        first_days = []
+        first_year_days = []
+        second_days = []
+        second_year_days = []
+
+        prev = None
+        for cur in _iter_months(self.start_date, self.end_date):
+            if prev is None:
+                prev = cur
+                continue
+
+            if cur.year == prev.year:
+                first_days.append((cur - prev).days)
+                second_days.append(0)
+            else:
+                first_days.append((Date(prev.year, prev.month, 31) - prev).days)
+                second_days.append((cur - Date(cur.year, cur.month, 1)).days + 1)
+
+            first_year_days.append(year_days(prev.year))
+            second_year_days.append(year_days(cur.year))
+            dates.append(cur)
+            prev = cur
+
+        self.dates = tuple(dates)
+        self.ordinals = tuple(date.toordinal() for date in dates)
+        self.first_days = tuple(first_days)
+        self.first_year_days = tuple(first_year_days)
+        self.second_days = tuple(second_days)
+        self.second_year_days = tuple(second_year_days)
+        self.remaining_months = range(len(dates), 0, -1)
+
+    def get_month_interests(self, interest):
+        day_interests = _get_day_interests(interest)
+        return [_get_days_interest(day_interests, *days) for days in self._iter_days()]
+
+    def calculate(self, credit, interest, payments={}, interest_changes={}):
+        credit = Decimal(credit)
+        interest_changes = _get_interest_changes(interest_changes)
+
+        payments = { get_date(date): Decimal(payment)
+            for date, payment in payments.items() }
+
+        interest = interest_changes.pop(self.start_date, Decimal(interest))
+        day_interests = _get_day_interests(interest)
+        month_interest_rate = _get_month_interest(interest)
+
+        schedule = []
+        cur_month_pay = month_pay = None
+
+        for date, days, months in zip(self.dates, self._iter_days(), self.remaining_months):
+            month_interest = _get_days_interest(day_interests, *days)
+
+            if month_pay is None or cur_month_pay != month_pay:
+                month_pay = _get_annuity_pay(credit, month_interest_rate, months)
+
+            cur_month_pay = payments.pop(date, month_pay)
+            if cur_month_pay < month_pay:
+                raise InvalidPaymentError(
+                    "Invalid payment for {}.", format_date(date))
+
+            interest_pay = _round_payment(credit * month_interest)
+            credit_pay = cur_month_pay - interest_pay
+            credit -= credit_pay
+
+            schedule.append(Payment(
+                date, credit_pay, interest_pay, cur_month_pay, credit))
+
+            if months > 1 and date in interest_changes:
+                interest = interest_changes.pop(date)
+                day_interests = _get_day_interests(interest)
+                month_interest_rate = _get_month_interest(interest)
+                month_pay = None
+
+        if interest_changes:
+            raise InvalidInterestChangeDateError(min(interest_changes))
+
+        if payments:
+            raise InvalidPaymentDateError("Invalid payment date: {}.",
+                format_date(payments.popitem()[0]))
+
+        if credit:
+            payment = schedule[-1]
+            schedule[-1] = Payment(
+                payment.date, payment.credit_pay + credit,
+                interest_pay, payment.month_pay + credit, 0)
+
+        return schedule
 
+    def _iter_days(self):
+        return zip(self.first_days, self.first_year_days, self.second_days, self.second_year_days)
+
+
+def _get_interest_changes(interest_changes):
+    return { get_date(date): Decimal(interest)
+        for date, interest in interest_changes.items() }
+
+
+def _nearest_valid_date(year, month, day):
     if year < 1 or month < 1 or month > 12 or day < 1 or day > 31:
-        raise InvalidDateError(date_string)
+        raise InvalidDateError(_format_date_string(year, month, day))
+
+    orig_day = day
 
     while True:
         try:
             return Date(year, month, day)
         except ValueError:
             if day < 28:
-                raise InvalidDateError(date_string)
+                raise InvalidDateError(_format_date_string(year, month, orig_day))
             day -= 1
 
 
+def _add_months(date, months):
+    month = date.month - 1 + months
+    return _nearest_valid_date(date.year + month // 12, month % 12 + 1, date.day)
+
+
+def _format_date_string(year, month, day):
+    return "{:02d}.{:02d}.{:04d}".format(day, month, year)
+
+
 
 def _iter_months(start_date_string, end_date_string):
     date = get_date(start_date_string)
@@ -95,13 +233,17 @@ def _iter_months(start_date_string, end_date_string):
         yield date
 
 
-def _iter_month_interest(start_date, end_date, year_interest):
+def _iter_month_interest(start_date, end_date, year_interest, interest_changes={}):
     year_interest = Decimal(year_interest) / 100
+    interest_changes = { date: interest / 100
+        for date, interest in _get_interest_changes(interest_changes).items() }
+    last_date = get_date(end_date)
 
     prev = None
     day_interest = None
     for cur in _iter_months(start_date, end_date):
         if prev is None:
+            year_interest = interest_changes.pop(cur, year_interest)
             day_interest = year_interest / year_days(cur.year)
             prev = cur
             continue
@@ -122,8 +264,16 @@ def _iter_month_interest(start_date, end_date, year_interest):
             interest += day_interest * cur_days
 
         yield MonthInterest(cur, interest)
+
+        if cur != last_date and cur in interest_changes:
+            year_interest = interest_changes.pop(cur)
+            day_interest = year_interest / year_days(cur.year)
+
         prev = cur
 
+    if interest_changes:
+        raise InvalidInterestChangeDateError(min(interest_changes))
+
 
 def _count_months(start_date, end_date):
     return functools.reduce(lambda count, date: count + 1,
@@ -135,31 +285,58 @@ def _round_payment(payment):
     return payment.quantize(Decimal("1.00"))
 
 
-def _get_month_pay(start_date, end_date, credit, interest):
-    credit = Decimal(credit)
-    months = _count_months(start_date, end_date)
-    month_interest = Decimal(interest) / 12 / 100
+def _get_day_interests(interest):
+    year_interest = Decimal(interest) / 100
+    return { days: year_interest / days for days in (365, 366) }
+
+
+def _get_days_interest(day_interests, first_days, first_year_days, second_days, second_year_days):
+    interest = day_interests[first_year_days] * first_days
+    if second_days:
+        interest += day_interests[second_year_days] * second_days
+
+    return interest
+
+
+def _get_month_interest(interest):
+    return Decimal(interest) / 12 / 100
 
-    month_pay = credit * (month_interest * (1 + month_interest) ** months) \
-        / ((1 + month_interest) ** months - 1)
 
-    return _round_payment(month_pay)
+def _get_annuity_factors(month_interest, months):
+    factor = (1 + month_interest) ** months
+    return month_interest * factor, factor - 1
 
 
-def _calculate(start_date, end_date, credit, interest, payments={}):
+def _get_annuity_pay(credit, month_interest, months):
+    numerator, denominator = _get_annuity_factors(month_interest, months)
+    return _round_payment(credit * numerator / denominator)
+
+
+def _get_month_pay(start_date, end_date, credit, interest):
+    return _get_annuity_pay(Decimal(credit),
+        _get_month_interest(interest), _count_months(start_date, end_date))
+
+
+def _calculate(start_date, end_date, credit, interest, payments={}, interest_changes={}):
     start_date = get_date(start_date)
     end_date = get_date(end_date)
     credit = Decimal(credit)
+    interest_changes = _get_interest_changes(interest_changes)
 
     payments = { get_date(date): Decimal(payment)
         for date, payment in payments.items() }
 
+    # Interest changes split the credit into segments. The month interest is
+    # calculated once per segment and the remaining month count is tracked
+    # instead of being recounted, so the annuity payment recalculation is cheap.
+    months = _count_months(start_date, end_date)
+    month_interest_rate = _get_month_interest(interest_changes.get(start_date, interest))
+
     schedule = []
-    prev_date = start_date
     cur_month_pay = month_pay = None
-    for date, month_interest in _iter_month_interest(start_date, end_date, interest):
+    for date, month_interest in _iter_month_interest(start_date, end_date, interest, interest_changes):
         if month_pay is None or cur_month_pay != month_pay:
-            month_pay = _get_month_pay(prev_date, end_date, credit, interest)
+            month_pay = _get_annuity_pay(credit, month_interest_rate, months)
 
         cur_month_pay = payments.pop(date, month_pay)
         if cur_month_pay < month_pay:
@@ -173,7 +350,10 @@ def _calculate(start_date, end_date, credit, interest, payments={}):
         schedule.append(Payment(
             date, credit_pay, interest_pay, cur_month_pay, credit))
 
-        prev_date = date
+        months -= 1
+        if date in interest_changes and months:
+            month_interest_rate = _get_month_interest(interest_changes[date])
+            month_pay = None
 
     if payments:
         raise InvalidPaymentDateError("Invalid payment date: {}.",
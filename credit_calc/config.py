@@ -60,11 +60,12 @@ def _get_config(config_path):
     try:
         return validate("config", config, DictScheme({
             "credits": List(DictScheme({
-                "amount":     _Amount(),
-                "interest":   _Interest(),
-                "start_date": _Date(),
-                "end_date":   _Date(),
-                "payments":   Dict(_Date(), _Amount(), optional=True),
+                "amount":           _Amount(),
+                "interest":         _Interest(),
+                "start_date":       _Date(),
+                "end_date":         _Date(),
+                "payments":         Dict(_Date(), _Amount(), optional=True),
+                "interest_changes": Dict(_Date(), _Interest(), optional=True),
             }))
         }))
     except Exception as e:
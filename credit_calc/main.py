@@ -7,10 +7,15 @@ from pcli.text_table import Table, Column
 
 from credit_calc import config
 from credit_calc import calculator
+from credit_calc import spool
+from credit_calc import verify
 
 from credit_calc.util import format_date
 
 
+_MB = 1024 * 1024
+
+
 def parse_args():
     config_path = "~/.credits.conf"
     parser = argparse.ArgumentParser(description="Credit calculator")
@@ -18,10 +23,40 @@ def parse_args():
         help="path to the credit configuration file (default is {})".format(config_path))
     parser.add_argument("--all", action="store_true", help="show all credits (not only active)")
     parser.add_argument("--schedule", action="store_true", help="show payment schedule for each credit")
+    parser.add_argument("--memory-limit", type=_positive_number, default=64, metavar="MB",
+        help="memory limit for payment schedules (default is 64 MB) above which they are spilled to disk")
+    parser.add_argument("--verify", type=_fraction, nargs="?", const=1, metavar="FRACTION",
+        help="recalculate the specified fraction of credits (all by default) with the reference engine and report mismatches")
+    parser.add_argument("--verify-time-budget", type=_positive_number, metavar="SECONDS",
+        help="time limit for the calculations in --verify mode")
     return parser.parse_args()
 
 
-def print_payment_schedule(credits):
+def _fraction(value):
+    try:
+        fraction = float(value)
+    except ValueError:
+        fraction = None
+
+    if fraction is None or not 0 < fraction <= 1:
+        raise argparse.ArgumentTypeError("invalid fraction (must be in (0, 1] range): {!r}".format(value))
+
+    return fraction
+
+
+def _positive_number(value):
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+
+    if number is None or not 0 < number < float("inf"):
+        raise argparse.ArgumentTypeError("invalid positive number: {!r}".format(value))
+
+    return number
+
+
+def print_payment_schedule(credits, schedule_spool):
     for credit in credits:
         table = Table([
             Column("date",         "Date",        align=Column.ALIGN_CENTER ),
@@ -33,7 +68,7 @@ def print_payment_schedule(credits):
 
         total_payments = 0
 
-        for payment in credit.schedule:
+        for payment in schedule_spool.iter_schedule(credit.schedule):
             table.add_row({
                 "date":         format_date(payment.date),
                 "credit_pay":   payment.credit_pay,
@@ -49,16 +84,29 @@ def print_payment_schedule(credits):
         table.draw("\n\nPayment schedule for {} credit from {}:".format(
             credit.amount, format_date(credit.start_date)))
 
+    print("\nPeak schedule memory: {:.1f} MB (limit is {:.1f} MB), spilled to disk: {:.1f} MB.".format(
+        schedule_spool.peak_memory / _MB, schedule_spool.memory_limit / _MB, schedule_spool.spilled_size / _MB))
 
-def print_credits(credits, print_all, with_schedule):
+
+def print_credits(credits, print_all, with_schedule, memory_limit=64 * _MB):
     if not credits:
         print("No credits specified.")
         return
 
+    if with_schedule:
+        with spool.ScheduleSpool(memory_limit) as schedule_spool:
+            _print_credits(credits, print_all, schedule_spool)
+    else:
+        _print_credits(credits, print_all, None)
+
+
+def _print_credits(credits, print_all, schedule_spool):
     today = datetime.date.today()
 
+    # Only the schedule IDs are kept with the credits: the schedules are held
+    # by the spool which spills them to disk when they exceed the memory limit.
     credits = sorted((
-        calculator.get_credit_info(today, **credit)
+        _spool_schedule(calculator.get_credit_info(today, **credit), schedule_spool)
         for credit in credits
             if print_all or credit["end_date"] >= today),
         key=lambda credit: credit.end_date)
@@ -112,15 +160,48 @@ def print_credits(credits, print_all, with_schedule):
 
     table.draw()
 
-    if with_schedule:
-        print_payment_schedule(credits)
+    if schedule_spool is not None:
+        print_payment_schedule(credits, schedule_spool)
+
+
+def _spool_schedule(credit, schedule_spool):
+    if schedule_spool is None:
+        return credit._replace(schedule=None)
+
+    schedule_id = schedule_spool.add(credit.schedule)
+
+    # Credit plans take about as much memory as the schedules, so they aren't
+    # kept in the cache beyond the spool's memory limit.
+    calculator.get_credit_plan.cache_clear()
+
+    return credit._replace(schedule=schedule_id)
+
+
+def verify_credits(credits, fraction, time_budget):
+    today = datetime.date.today()
+    calculate = lambda **credit: calculator.get_credit_info(today, **credit).schedule
+
+    result = verify.verify_credits(credits, calculate, fraction, time_budget)
+
+    for mismatch in result.mismatches:
+        print("Mismatch for {} credit from {}: {} for {} is {} instead of {}.".format(
+            mismatch.credit["amount"], format_date(mismatch.credit["start_date"]),
+            mismatch.field, format_date(mismatch.date), mismatch.actual, mismatch.expected))
+
+    print("\nVerified credits: {}, skipped due to time budget: {}, mismatches: {}.".format(
+        result.checked, result.skipped, len(result.mismatches)))
+
+    return not result.mismatches
 
 
 def main():
     try:
         args = parse_args()
         credits = config.get_credits(args.config)
-        print_credits(credits, args.all, args.schedule)
+        print_credits(credits, args.all, args.schedule, int(args.memory_limit * _MB))
+
+        if args.verify is not None and not verify_credits(credits, args.verify, args.verify_time_budget):
+            sys.exit(1)
     except Exception as e:
         sys.exit("Error: {}".format(e))
 
@@ -0,0 +1,100 @@
+import itertools
+
+from collections import namedtuple
+from decimal import Decimal, DecimalException
+
+from credit_calc.util import Error, get_date
+
+from credit_calc.calculator import get_credit_plan
+from credit_calc.calculator import _add_months
+from credit_calc.calculator import _get_month_interest, _get_annuity_factors, _round_payment
+
+GridCell = namedtuple("GridCell", ("interest", "months", "amount", "month_pay", "total_interest", "overpayment"))
+
+
+class InvalidTermError(Error):
+    def __init__(self, months):
+        super(InvalidTermError, self).__init__("Invalid credit term: {}.", months)
+
+class InvalidInterestError(Error):
+    def __init__(self, interest):
+        super(InvalidInterestError, self).__init__("Invalid credit interest: {}.", interest)
+
+class InvalidAmountError(Error):
+    def __init__(self, amount):
+        super(InvalidAmountError, self).__init__("Invalid credit amount: {}.", amount)
+
+
+def evaluate_grid(start_date, interests, terms, amounts):
+    # Returns a cell for each interest, term (in months) and amount combination
+    # of a credit without prepayments. Overpayment is in percent of the amount.
+
+    start_date = get_date(start_date)
+    interests = [_get_interest(interest) for interest in interests]
+    terms = list(terms)
+    amounts = [_get_amount(amount) for amount in amounts]
+
+    for months in terms:
+        if isinstance(months, bool) or not isinstance(months, int) or months < 1:
+            raise InvalidTermError(months)
+
+    if not terms:
+        return []
+
+    # Month dates of shorter terms are a prefix of the longest term's ones, so
+    # the calendar and month interests are calculated only once per interest.
+    plan = get_credit_plan(start_date, _add_months(start_date, max(terms)))
+
+    cells = []
+
+    for interest in interests:
+        month_interests = plan.get_month_interests(interest)
+        month_interest_rate = _get_month_interest(interest)
+
+        for months in terms:
+            numerator, denominator = _get_annuity_factors(month_interest_rate, months)
+
+            for amount in amounts:
+                month_pay = _round_payment(amount * numerator / denominator)
+                total_interest = _get_total_interest(
+                    amount, month_pay, itertools.islice(month_interests, months))
+
+                cells.append(GridCell(interest, months, amount, month_pay, total_interest,
+                    (total_interest / amount * 100).quantize(Decimal("1.00"))))
+
+    return cells
+
+
+def _get_interest(interest):
+    try:
+        value = Decimal(interest)
+    except DecimalException:
+        raise InvalidInterestError(interest)
+
+    if not value.is_finite() or value <= 0 or value >= 100:
+        raise InvalidInterestError(interest)
+
+    return value
+
+
+def _get_amount(amount):
+    try:
+        value = Decimal(amount)
+    except DecimalException:
+        raise InvalidAmountError(amount)
+
+    if not value.is_finite() or value <= 0:
+        raise InvalidAmountError(amount)
+
+    return value
+
+
+def _get_total_interest(credit, month_pay, month_interests):
+    total_interest = 0
+
+    for month_interest in month_interests:
+        interest_pay = _round_payment(credit * month_interest)
+        credit -= month_pay - interest_pay
+        total_interest += interest_pay
+
+    return total_interest
@@ -0,0 +1,123 @@
+import array
+import struct
+import sys
+import tempfile
+
+from datetime import date as Date
+from decimal import Decimal
+
+from credit_calc.calculator import Payment
+
+# Payment date ordinal and credit pay, interest pay, month pay and credit
+# stored as (coefficient, exponent) pairs. Values that don't fit into a pair
+# are stored as strings following the record with their length as the
+# coefficient and _STRING_EXPONENT as the exponent.
+_RECORD = struct.Struct("<i" + "qb" * 4)
+_STRING_EXPONENT = -128
+_MAX_COEFFICIENT = 2 ** 63 - 1
+
+
+class ScheduleSpool:
+    # Stores payment schedules in a temporary file. Schedules are kept in
+    # memory while their estimated size fits into memory_limit bytes, then the
+    # whole chunk is spilled to the file in a compact binary form. A single
+    # schedule that doesn't fit into the limit is kept in memory alone.
+
+    def __init__(self, memory_limit):
+        self.memory_limit = memory_limit
+        self.peak_memory = 0
+        self.spilled_size = 0
+
+        self._file = tempfile.TemporaryFile()
+        self._offsets = array.array("q")
+        self._sizes = array.array("q")
+
+        self._chunk = []
+        self._chunk_memory = 0
+        self._payment_memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, schedule):
+        if schedule and self._payment_memory is None:
+            self._payment_memory = _get_payment_memory(schedule[0])
+
+        memory = sys.getsizeof(schedule) + len(schedule) * (self._payment_memory or 0)
+        if self._chunk and self._chunk_memory + memory > self.memory_limit:
+            self.flush()
+
+        self._chunk.append(schedule)
+        self._chunk_memory += memory
+        self.peak_memory = max(self.peak_memory, self._chunk_memory)
+
+        return len(self._offsets) + len(self._chunk) - 1
+
+    def flush(self):
+        self._file.seek(0, 2)
+
+        for schedule in self._chunk:
+            data = b"".join(_pack_payment(payment) for payment in schedule)
+
+            self._offsets.append(self.spilled_size)
+            self._sizes.append(len(data))
+            self._file.write(data)
+            self.spilled_size += len(data)
+
+        self._chunk = []
+        self._chunk_memory = 0
+
+    def iter_schedule(self, schedule_id):
+        if schedule_id >= len(self._offsets):
+            yield from self._chunk[schedule_id - len(self._offsets)]
+            return
+
+        self._file.seek(self._offsets[schedule_id])
+        yield from _unpack_payments(self._file.read(self._sizes[schedule_id]))
+
+    def close(self):
+        self._file.close()
+
+
+def _get_payment_memory(payment):
+    return sys.getsizeof(payment) + sum(sys.getsizeof(value) for value in payment)
+
+
+def _pack_payment(payment):
+    values = [payment.date.toordinal()]
+    strings = []
+
+    for value in payment[1:]:
+        value = Decimal(value)
+        sign, digits, exponent = value.as_tuple()
+        coefficient = int("".join(map(str, digits)))
+
+        if coefficient <= _MAX_COEFFICIENT and _STRING_EXPONENT < exponent <= 127:
+            values.extend((-coefficient if sign else coefficient, exponent))
+        else:
+            string = str(value).encode()
+            values.extend((len(string), _STRING_EXPONENT))
+            strings.append(string)
+
+    return _RECORD.pack(*values) + b"".join(strings)
+
+
+def _unpack_payments(data):
+    offset = 0
+
+    while offset < len(data):
+        record = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+
+        values = []
+        for coefficient, exponent in zip(record[1::2], record[2::2]):
+            if exponent == _STRING_EXPONENT:
+                values.append(Decimal(data[offset:offset + coefficient].decode()))
+                offset += coefficient
+            else:
+                values.append(Decimal(coefficient).scaleb(exponent))
+
+        yield Payment(Date.fromordinal(record[0]), *values)
@@ -0,0 +1,73 @@
+import random
+import time
+
+from collections import namedtuple
+
+from credit_calc.util import Error
+
+from credit_calc.calculator import _calculate
+
+class InvalidFractionError(Error):
+    def __init__(self, fraction):
+        super(InvalidFractionError, self).__init__("Invalid fraction of credits to verify: {}.", fraction)
+
+Mismatch = namedtuple("Mismatch", ("credit", "date", "field", "expected", "actual"))
+Verification = namedtuple("Verification", ("checked", "skipped", "mismatches"))
+
+_PAYMENT_FIELDS = ("credit_pay", "interest_pay", "month_pay", "credit")
+
+
+def verify_credits(credits, calculate, fraction=1, time_budget=None, rand=random):
+    # calculate is called with the credit configuration as keyword arguments
+    # and must return a payment schedule. time_budget limits the time (in
+    # seconds) spent on both the checked and the reference calculations.
+
+    if not 0 < fraction <= 1:
+        raise InvalidFractionError(fraction)
+
+    checked = skipped = 0
+    mismatches = []
+    spent_time = 0
+
+    for credit in credits:
+        if rand.random() >= fraction:
+            continue
+
+        if time_budget is not None and spent_time >= time_budget:
+            skipped += 1
+            continue
+
+        start_time = time.monotonic()
+        schedule = calculate(**credit)
+        reference_schedule = _calculate_reference(**credit)
+        spent_time += time.monotonic() - start_time
+
+        mismatch = _compare_schedules(credit, reference_schedule, schedule)
+        if mismatch is not None:
+            mismatches.append(mismatch)
+
+        checked += 1
+
+    return Verification(checked, skipped, mismatches)
+
+
+def _calculate_reference(start_date, end_date, amount, interest, payments={}, interest_changes={}):
+    return _calculate(start_date, end_date, amount, interest, payments, interest_changes)
+
+
+def _compare_schedules(credit, expected, actual):
+    for expected_payment, actual_payment in zip(expected, actual):
+        if actual_payment.date != expected_payment.date:
+            return Mismatch(credit, expected_payment.date, "date",
+                expected_payment.date, actual_payment.date)
+
+        for field in _PAYMENT_FIELDS:
+            expected_value = getattr(expected_payment, field)
+            actual_value = getattr(actual_payment, field)
+
+            if actual_value != expected_value:
+                return Mismatch(credit, expected_payment.date, field, expected_value, actual_value)
+
+    if len(actual) != len(expected):
+        date = (expected if len(expected) > len(actual) else actual)[min(len(expected), len(actual))].date
+        return Mismatch(credit, date, "payments", len(expected), len(actual))
@@ -9,11 +9,13 @@ from credit_calc.util import get_date
 from credit_calc.calculator import Credit, MonthInterest
 from credit_calc.calculator import InvalidDateRangeError
 from credit_calc.calculator import InvalidPaymentError, InvalidPaymentDateError
+from credit_calc.calculator import InvalidInterestChangeDateError
 
 from credit_calc.calculator import get_credit_info
-from credit_calc.calculator import _nearest_valid_date
+from credit_calc.calculator import _nearest_valid_date, _add_months
 from credit_calc.calculator import _iter_months, _iter_month_interest, _count_months
 from credit_calc.calculator import _round_payment, _get_month_pay, _calculate
+from credit_calc.calculator import CreditPlan, get_credit_plan
 
 
 def test_nearest_valid_date_valid():
@@ -33,6 +35,12 @@ def test_nearest_valid_date_invalid_for_month():
     assert _nearest_valid_date(2013, 2, 31) == Date(2013, 2, 28)
 
 
+def test_add_months():
+    assert _add_months(Date(2012, 12, 31), 2) == Date(2013, 2, 28)
+    assert _add_months(Date(2012, 5, 17), 60) == Date(2017, 5, 17)
+    assert _add_months(Date(2012, 1, 31), 1) == Date(2012, 2, 29)
+
+
 def test_iter_months_simple():
     assert list(_iter_months("15.03.2013", "15.05.2013")) == [
         get_date("15.03.2013"), get_date("15.04.2013"), get_date("15.05.2013") ]
@@ -241,6 +249,62 @@ def test_calculate_2000():
     _check_payment(schedule[-2], "28.04.2033", "8062.20", "157.85", "8220.05")
     _check_payment(schedule[-1], "28.05.2033", "7109.96", "71.59", "7181.55", overall_precision="0.26")
 
+def test_calculate_with_interest_changes():
+    schedule = _calculate("17.05.2012", "17.05.2017", "450000", "17.5", interest_changes={
+        "17.05.2013": "12",
+    })
+    assert schedule[:12] == _calculate("17.05.2012", "17.05.2017", "450000", "17.5")[:12]
+    assert schedule[12].month_pay == _get_month_pay("17.05.2013", "17.05.2017", schedule[11].credit, "12")
+    _check_payment(schedule[12], "17.06.2013", "6266.53", "3956.56", "10223.09")
+    _check_payment(schedule[13], "17.07.2013", "6455.96", "3767.13", "10223.09")
+    _check_payment(schedule[-1], "17.05.2017", "10314.15", "101.73", "10415.88")
+
+def test_calculate_with_interest_change_on_start_date():
+    assert _calculate("17.05.2012", "17.05.2017", "450000", "17.5", interest_changes={
+        "17.05.2012": "12",
+    }) == _calculate("17.05.2012", "17.05.2017", "450000", "12")
+
+def test_calculate_with_invalid_interest_change_date():
+    for date in ("18.05.2013", "17.05.2017", "17.05.2020"):
+        with pytest.raises(InvalidInterestChangeDateError):
+            _calculate("17.05.2012", "17.05.2017", "450000", "17.5", interest_changes={
+                date: "12"
+            })
+
+def test_credit_plan():
+    plan = CreditPlan("30.11.2012", "28.02.2013")
+    assert plan.dates == (Date(2012, 12, 30), Date(2013, 1, 30), Date(2013, 2, 28))
+    assert plan.ordinals == tuple(date.toordinal() for date in plan.dates)
+    assert plan.first_days == (30, 1, 29)
+    assert plan.first_year_days == (366, 366, 365)
+    assert plan.second_days == (0, 30, 0)
+    assert plan.second_year_days == (366, 365, 365)
+    assert list(plan.remaining_months) == [3, 2, 1]
+
+def test_credit_plan_calculate():
+    plan = get_credit_plan(get_date("17.05.2012"), get_date("17.05.2017"))
+    assert get_credit_plan(get_date("17.05.2012"), get_date("17.05.2017")) is plan
+
+    for payments, interest_changes in (
+        ({}, {}),
+        ({ "17.06.2012": "14125.22", "17.08.2012": "19020.00" }, {}),
+        ({ "17.06.2012": "14125.22" }, { "17.05.2012": "16", "17.12.2013": "12" }),
+    ):
+        assert plan.calculate("450000", "17.5", payments, interest_changes) == \
+            _calculate("17.05.2012", "17.05.2017", "450000", "17.5", payments, interest_changes)
+
+def test_credit_plan_calculate_errors():
+    plan = CreditPlan("17.05.2012", "17.05.2017")
+
+    with pytest.raises(InvalidPaymentDateError):
+        plan.calculate("450000", "17.5", { "19.06.2013": "100000" })
+
+    with pytest.raises(InvalidPaymentError):
+        plan.calculate("450000", "17.5", { "17.06.2012": "1" })
+
+    with pytest.raises(InvalidInterestChangeDateError):
+        plan.calculate("450000", "17.5", interest_changes={ "17.05.2017": "12" })
+
 def _check_payment(payment, date, credit_pay, interest_pay, month_pay, overall_precision="0.01"):
     def check(payment, right_payment, precision):
         right_payment = Decimal(right_payment)
@@ -283,3 +347,18 @@ def test_get_credit_info():
     check("27.06.2013", 2000000, 110000)
     check("18.10.2013", "731957.77", "8220.05")
     check("1.1.2100", 0, None)
+
+
+def test_get_credit_info_with_interest_changes():
+    interest_changes = { "17.05.2013": "12" }
+
+    def check(info_date, interest):
+        credit = get_credit_info(info_date, "17.05.2012", "17.05.2017", "450000", "17.5",
+            interest_changes=interest_changes)
+        assert credit.interest == Decimal(interest)
+        assert credit.schedule == _calculate("17.05.2012", "17.05.2017", "450000", "17.5",
+            interest_changes=interest_changes)
+
+    check("17.05.2012", "17.5")
+    check("17.05.2013", "17.5")
+    check("18.05.2013", "12")
@@ -0,0 +1,244 @@
+import calendar
+import functools
+import os
+import random
+import time
+
+import pytest
+
+from decimal import Decimal
+from datetime import date as Date
+
+from credit_calc.util import year_days
+
+from credit_calc.calculator import _nearest_valid_date, _add_months
+from credit_calc.calculator import _iter_months, _iter_month_interest
+from credit_calc.calculator import _calculate
+from credit_calc.calculator import CreditPlan
+
+
+SEED = int(os.environ.get("CREDIT_CALC_SEED", 0))
+CREDITS = int(os.environ.get("CREDIT_CALC_CREDITS", 50))
+
+# Set CREDIT_CALC_STRESS to the number of credits to time schedule
+# generation on and to get a report about the slowest ones. The stress
+# credits aren't limited by MAX_GROWTH, so pathological inputs are reported.
+# The report is printed bypassing pytest output capturing.
+STRESS_CREDITS = int(os.environ.get("CREDIT_CALC_STRESS", 0))
+STRESS_REPORT_SIZE = 10
+
+
+# The month pay is calculated using 1/12 of the year interest while interest
+# is charged for the actual number of days. The difference compounds over
+# the credit term, so for credits with high interest and long terms the
+# balance may become negative before the end date. Generated interests are
+# limited to keep (1 + month interest) ** months below this value.
+MAX_GROWTH = 10
+
+
+def _random_credit(rand, with_interest_changes=False, max_growth=MAX_GROWTH):
+    year = rand.choice((rand.randint(1990, 2030), rand.choice((2000, 2012, 2016, 2024))))
+    month = rand.randint(1, 12)
+    day = rand.choice((rand.randint(1, 28), rand.randint(29, 31)))
+    start_date = _nearest_valid_date(year, month, day)
+
+    months = rand.choice((rand.randint(1, 12), rand.randint(1, 600)))
+    dates = list(_iter_months(start_date, _add_months(start_date, months)))
+    end_date = dates[-1]
+
+    max_interest = 4000
+    if max_growth is not None:
+        max_interest = min(max_interest, int(1200 * 100 * (max_growth ** (1 / months) - 1)))
+
+    random_interest = lambda: Decimal(rand.randint(10, max_interest)) / 100
+
+    amount = Decimal(rand.randint(100000, 10000000))
+    interest = random_interest()
+
+    interest_changes = {}
+    if with_interest_changes:
+        for date in dates[:-1]:
+            if rand.random() < 0.2:
+                interest_changes[date] = random_interest()
+
+    # Prepayments are made in about a half of the months of the first half of
+    # the credit term. To not recalculate the schedule after each of them, they
+    # are decided for a year at a time using the schedule calculated with all
+    # previous prepayments (and all interest changes). Each one exceeds the
+    # month pay from this schedule by at least one more month pay, so it stays
+    # valid though the month pay has been lowered by the previous ones.
+    # Prepayments are stopped before the balance falls below a quarter of the
+    # credit amount, so the credit can't be repaid before its end date and the
+    # month pay stays much greater than the payment rounding errors.
+    payments = {}
+    schedule = _calculate(start_date, end_date, amount, interest, payments, interest_changes)
+    calculated_index = 0
+    prepaid = 0
+
+    for index in range(1, len(schedule) // 2):
+        if prepaid and index - calculated_index >= 12:
+            schedule = _calculate(start_date, end_date, amount, interest, payments, interest_changes)
+            calculated_index = index
+            prepaid = 0
+
+        if rand.random() >= 0.5:
+            continue
+
+        month_pay = schedule[index].month_pay
+        balance = schedule[index - 1].credit - prepaid
+        extra = (month_pay * (1 + Decimal(rand.random()) * 5)).quantize(Decimal("1.00"))
+
+        if balance - month_pay - extra >= amount / 4:
+            payments[schedule[index].date] = month_pay + extra
+            prepaid += extra
+
+    return dict(start_date=start_date, end_date=end_date, credit=amount, interest=interest,
+        payments=payments, interest_changes=interest_changes)
+
+
+@functools.lru_cache()
+def _get_random_credits(count, **kwargs):
+    rand = random.Random(SEED)
+    return tuple(_random_credit(rand, **kwargs) for _ in range(count))
+
+
+def _check_schedule(credit, schedule, overpayment_allowed=False):
+    assert len(schedule) == len(list(_iter_months(credit["start_date"], credit["end_date"]))) - 1
+    assert schedule[-1].credit == 0
+    assert sum(payment.credit_pay for payment in schedule) == credit["credit"]
+
+    balance = credit["credit"]
+    for payment in schedule:
+        assert payment.credit_pay + payment.interest_pay == payment.month_pay
+        assert payment.credit == balance - payment.credit_pay
+        balance = payment.credit
+
+    if not overpayment_allowed:
+        for payment in schedule[:-1]:
+            assert payment.credit >= 0
+            assert payment.interest_pay >= 0
+
+    # The month pay is changed only by prepayments and interest changes
+    recalculation_dates = set(credit["payments"]) | set(credit["interest_changes"])
+    for prev, cur in zip(schedule, schedule[1:-1]):
+        if prev.date not in recalculation_dates and cur.date not in credit["payments"]:
+            assert cur.month_pay == prev.month_pay
+
+
+def _find_anomalies(credit, schedule):
+    # The balance may drift away from the annuity calculation (see MAX_GROWTH).
+    # These aren't errors, but point to inputs for which the schedule looks
+    # unexpected.
+
+    anomalies = set()
+
+    balance = credit["credit"]
+    month_pay = None
+
+    for payment in schedule[:-1]:
+        if payment.credit > balance:
+            anomalies.add("balance growth")
+
+        if payment.credit < 0:
+            anomalies.add("negative balance")
+
+        if payment.interest_pay < 0:
+            anomalies.add("negative interest")
+
+        if payment.date not in credit["payments"]:
+            if (
+                month_pay is not None and payment.month_pay > month_pay and
+                not credit["interest_changes"]
+            ):
+                anomalies.add("month pay growth")
+
+            month_pay = payment.month_pay
+
+        balance = payment.credit
+
+    return anomalies
+
+
+def test_iter_months_properties():
+    for credit in _get_random_credits(CREDITS):
+        start_date = credit["start_date"]
+        dates = list(_iter_months(start_date, credit["end_date"]))
+
+        for prev, cur in zip(dates, dates[1:]):
+            assert (cur.year * 12 + cur.month) - (prev.year * 12 + prev.month) == 1
+            assert cur.day == min(start_date.day, calendar.monthrange(cur.year, cur.month)[1])
+
+def test_iter_month_interest_properties():
+    for credit in _get_random_credits(CREDITS):
+        year_interest = credit["interest"] / 100
+        month_interests = _iter_month_interest(credit["start_date"], credit["end_date"], credit["interest"])
+
+        prev = credit["start_date"]
+        for date, interest in month_interests:
+            expected = sum(
+                year_interest * (min(date, Date(year, 12, 31)) - max(prev, Date(year - 1, 12, 31))).days
+                    / year_days(year)
+                for year in range(prev.year, date.year + 1))
+
+            assert abs(interest - expected) < Decimal("1e-20")
+            prev = date
+
+def test_calculate_properties():
+    for credit in _get_random_credits(CREDITS):
+        _check_schedule(credit, _calculate(**credit))
+
+def test_calculate_with_interest_changes_properties():
+    for credit in _get_random_credits(CREDITS, with_interest_changes=True):
+        _check_schedule(credit, _calculate(**credit))
+
+def test_credit_plan_matches_reference():
+    for with_interest_changes in (False, True):
+        for credit in _get_random_credits(CREDITS, with_interest_changes=with_interest_changes):
+            plan = CreditPlan(credit["start_date"], credit["end_date"])
+            assert plan.calculate(credit["credit"], credit["interest"],
+                credit["payments"], credit["interest_changes"]) == _calculate(**credit)
+
+
+@pytest.mark.skipif(not STRESS_CREDITS, reason="CREDIT_CALC_STRESS is not set")
+def test_calculate_stress(capsys):
+    timings = []
+    anomalies = {}
+    plan_time = 0
+
+    for with_interest_changes in (False, True):
+        for credit in _get_random_credits(
+            STRESS_CREDITS, with_interest_changes=with_interest_changes, max_growth=None
+        ):
+            start_time = time.perf_counter()
+            schedule = _calculate(**credit)
+            timings.append((time.perf_counter() - start_time, len(schedule), credit))
+
+            _check_schedule(credit, schedule, overpayment_allowed=True)
+
+            start_time = time.perf_counter()
+            CreditPlan(credit["start_date"], credit["end_date"]).calculate(
+                credit["credit"], credit["interest"], credit["payments"], credit["interest_changes"])
+            plan_time += time.perf_counter() - start_time
+
+            for anomaly in _find_anomalies(credit, schedule):
+                anomalies.setdefault(anomaly, []).append(credit)
+
+    timings.sort(key=lambda timing: timing[0], reverse=True)
+    total_time = sum(timing[0] for timing in timings)
+    total_months = sum(timing[1] for timing in timings)
+
+    with capsys.disabled():
+        print("\nCalculated {} credits ({} months) in {:.3f}s ({:.1f}us per month). The slowest ones:".format(
+            len(timings), total_months, total_time, total_time / total_months * 1000000))
+
+        for elapsed_time, months, credit in timings[:STRESS_REPORT_SIZE]:
+            print("{:.3f}s ({} months): {}".format(elapsed_time, months, credit))
+
+        print("\nCredit plans: {:.3f}s ({:.1f}us per month).".format(
+            plan_time, plan_time / total_months * 1000000))
+
+        for anomaly, credits in sorted(anomalies.items()):
+            print("\n{}: {} credits, for example:".format(anomaly.capitalize(), len(credits)))
+
+            for credit in credits[:STRESS_REPORT_SIZE]:
+                print(credit)
@@ -0,0 +1,53 @@
+import pytest
+
+from decimal import Decimal
+
+from credit_calc.util import get_date
+
+from credit_calc.calculator import CreditPlan, _add_months, _get_month_pay
+from credit_calc.sensitivity import GridCell, InvalidAmountError, InvalidInterestError, InvalidTermError
+from credit_calc.sensitivity import evaluate_grid
+
+
+def test_evaluate_grid():
+    interests = ("12.25", "16.65", "17.5")
+    terms = (1, 12, 60, 240)
+    amounts = ("450000", "2000000")
+
+    cells = evaluate_grid("31.01.2012", interests, terms, amounts)
+    assert len(cells) == len(interests) * len(terms) * len(amounts)
+
+    cells = iter(cells)
+    for interest in interests:
+        for months in terms:
+            end_date = _add_months(get_date("31.01.2012"), months)
+
+            for amount in amounts:
+                schedule = CreditPlan("31.01.2012", end_date).calculate(amount, interest)
+                total_interest = sum(payment.interest_pay for payment in schedule)
+
+                assert next(cells) == GridCell(
+                    Decimal(interest), months, Decimal(amount),
+                    _get_month_pay("31.01.2012", end_date, amount, interest), total_interest,
+                    (total_interest / Decimal(amount) * 100).quantize(Decimal("1.00")))
+
+def test_evaluate_grid_overpayment():
+    cell, = evaluate_grid("17.05.2012", ("17.5",), (60,), ("450000",))
+    assert cell.month_pay == Decimal("11305")
+    assert cell.total_interest == Decimal("228475.66")
+    assert cell.overpayment == Decimal("50.77")
+
+def test_evaluate_grid_invalid_term():
+    for months in (0, -1, 12.5, "12", True):
+        with pytest.raises(InvalidTermError):
+            evaluate_grid("17.05.2012", ("17.5",), (60, months), ("450000",))
+
+def test_evaluate_grid_invalid_amount():
+    for amount in ("0", "-1", "NaN", "Infinity", "abc"):
+        with pytest.raises(InvalidAmountError):
+            evaluate_grid("17.05.2012", ("17.5",), (60,), ("450000", amount))
+
+def test_evaluate_grid_invalid_interest():
+    for interest in ("0", "-5", "100", "NaN", "abc"):
+        with pytest.raises(InvalidInterestError):
+            evaluate_grid("17.05.2012", ("17.5", interest), (60,), ("450000",))
@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from credit_calc.calculator import Payment, _calculate
+from credit_calc.spool import ScheduleSpool, _pack_payment, _unpack_payments, _RECORD
+
+
+def test_pack_payment():
+    payment = Payment(_calculate("17.05.2012", "17.05.2017", "450000", "17.5")[0].date,
+        Decimal("4634.92"), Decimal("-0.05"), Decimal("1E+3"), 0)
+
+    data = _pack_payment(payment)
+    assert len(data) == _RECORD.size
+
+    unpacked, = _unpack_payments(data)
+    assert unpacked == payment
+    assert [str(value) for value in unpacked[1:]] == ["4634.92", "-0.05", "1E+3", "0"]
+
+def test_pack_payment_overflow():
+    payment = Payment(_calculate("17.05.2012", "17.05.2017", "450000", "17.5")[0].date,
+        Decimal("100000.1234567890123456"), Decimal("-9223372036854775808"),
+        Decimal("1E+200"), Decimal("1E-200"))
+
+    data = _pack_payment(payment) + _pack_payment(payment._replace(credit_pay=Decimal("1.00")))
+    assert len(data) > 2 * _RECORD.size
+
+    unpacked = list(_unpack_payments(data))
+    assert unpacked == [payment, payment._replace(credit_pay=Decimal("1.00"))]
+    assert [str(value) for value in unpacked[0][1:]] == [
+        "100000.1234567890123456", "-9223372036854775808", "1E+200", "1E-200"]
+
+
+def test_schedule_spool():
+    schedules = [
+        _calculate("17.05.2012", "17.05.2017", "450000", "17.5"),
+        _calculate("21.12.2011", "21.12.2016", "500000", "16.65", { "21.07.2012": "22071.39" }),
+        [],
+        _calculate("28.05.2013", "28.05.2033", "2000000", "12.25"),
+    ]
+
+    with ScheduleSpool(memory_limit=1) as spool:
+        assert [spool.add(schedule) for schedule in schedules] == [0, 1, 2, 3]
+        assert spool.spilled_size == sum(len(schedule) for schedule in schedules[:-1]) * _RECORD.size
+
+        for schedule_id in (3, 0, 2, 1):
+            assert list(spool.iter_schedule(schedule_id)) == schedules[schedule_id]
+
+    with ScheduleSpool(memory_limit=1024 * 1024) as spool:
+        assert [spool.add(schedule) for schedule in schedules] == [0, 1, 2, 3]
+        assert 0 < spool.peak_memory < spool.memory_limit
+
+        for schedule_id, schedule in enumerate(schedules):
+            assert list(spool.iter_schedule(schedule_id)) == schedule
+
+        assert spool.spilled_size == 0
+
+        spool.flush()
+        schedules.append(_calculate("26.12.2011", "26.12.2016", "500000", "16.65"))
+        assert spool.add(schedules[-1]) == 4
+
+        for schedule_id, schedule in enumerate(schedules):
+            assert list(spool.iter_schedule(schedule_id)) == schedule
+
+def test_schedule_spool_overflow():
+    schedule = _calculate("17.05.2012", "17.05.2017", "100000.1234567890123456", "17.5")
+
+    with ScheduleSpool(memory_limit=1) as spool:
+        assert [spool.add(schedule), spool.add(schedule)] == [0, 1]
+        assert spool.spilled_size > len(schedule) * _RECORD.size
+        assert list(spool.iter_schedule(0)) == schedule
@@ -0,0 +1,70 @@
+import pytest
+import random
+import time
+
+from decimal import Decimal
+
+from credit_calc.util import get_date
+
+from credit_calc.verify import InvalidFractionError, Mismatch, verify_credits
+from credit_calc.verify import _calculate_reference
+
+
+CREDITS = [{
+    "amount":     "450000",
+    "interest":   "17.5",
+    "start_date": "17.05.2012",
+    "end_date":   "17.05.2017",
+}, {
+    "amount":     "500000",
+    "interest":   "16.65",
+    "start_date": "21.12.2011",
+    "end_date":   "21.12.2016",
+    "payments":   { "21.07.2012": "22071.39" },
+}]
+
+
+def test_verify_credits():
+    result = verify_credits(CREDITS, _calculate_reference)
+    assert result.checked == 2
+    assert result.skipped == 0
+    assert result.mismatches == []
+
+def test_verify_credits_mismatch():
+    def calculate(**credit):
+        schedule = _calculate_reference(**credit)
+        schedule[3] = schedule[3]._replace(interest_pay=schedule[3].interest_pay + Decimal("0.01"))
+        return schedule
+
+    result = verify_credits(CREDITS[:1], calculate)
+    expected = _calculate_reference(**CREDITS[0])[3].interest_pay
+    assert result.mismatches == [Mismatch(
+        CREDITS[0], get_date("17.09.2012"), "interest_pay", expected, expected + Decimal("0.01"))]
+
+def test_verify_credits_schedule_length_mismatch():
+    result = verify_credits(CREDITS[:1], lambda **credit: _calculate_reference(**credit)[:-1])
+    assert result.mismatches == [Mismatch(CREDITS[0], get_date("17.05.2017"), "payments", 60, 59)]
+
+def test_verify_credits_sampling():
+    result = verify_credits(CREDITS * 50, _calculate_reference, fraction=0.2, rand=random.Random(0))
+    assert 0 < result.checked < 50
+    assert result.skipped == 0
+
+def test_verify_credits_time_budget():
+    result = verify_credits(CREDITS, _calculate_reference, time_budget=0)
+    assert result.checked == 0
+    assert result.skipped == 2
+
+def test_verify_credits_time_budget_includes_calculation():
+    def calculate(**credit):
+        time.sleep(0.05)
+        return _calculate_reference(**credit)
+
+    result = verify_credits(CREDITS, calculate, time_budget=0.01)
+    assert result.checked == 1
+    assert result.skipped == 1
+
+def test_verify_credits_invalid_fraction():
+    for fraction in (0, -0.5, 1.5, float("nan")):
+        with pytest.raises(InvalidFractionError):
+            verify_credits(CREDITS, _calculate_reference, fraction=fraction)